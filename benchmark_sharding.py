@@ -0,0 +1,150 @@
+# 分片模式吞吐量基准测试：使用模拟的 Bot API，对比 1 到 N 个工作进程的处理速度
+# 用法: python benchmark_sharding.py --max-workers 4 --updates 4000 --latency 0
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+# 必须在导入 config 之前设置，工作进程重新导入本模块时同样生效
+BENCH_DB = os.path.join(tempfile.gettempdir(), "sgmessenger_bench.db")
+OWNER_ID = 10000
+GROUP_ID = -1001234567890
+os.environ.update(
+    BOT_TOKEN="123456:ABC-DEF1234ghIkl-zyx57W2v1u123ew11",
+    OWNER_ID=str(OWNER_ID),
+    GROUP_ID=str(GROUP_ID),
+    DB_NAME=BENCH_DB,
+    FLOOD_LIMIT_SECONDS="0"
+)
+
+import logging
+from telegram.request import BaseRequest, RequestData
+
+from main import build_application
+from sharding import ShardPool
+
+logging.getLogger().setLevel(logging.WARNING)
+
+TOPIC_OFFSET = 100000  # 基准数据中话题ID = 用户ID + TOPIC_OFFSET
+BATCH_SIZE = 100  # 与 getUpdates 单次最多返回的条数一致
+
+class BenchRequest(BaseRequest):
+    """模拟 Bot API，按接口返回最小可用的结果，可选模拟网络延迟"""
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return None
+    async def initialize(self) -> None:
+        pass
+    async def shutdown(self) -> None:
+        pass
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout: Any = None,
+        write_timeout: Any = None,
+        connect_timeout: Any = None,
+        pool_timeout: Any = None,
+    ) -> Tuple[int, bytes]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        endpoint = url.rsplit("/", 1)[-1]
+        params = request_data.parameters if request_data else {}
+        if endpoint == "getMe":
+            result: Any = {"id": 1, "is_bot": True, "first_name": "bench", "username": "bench_bot"}
+        elif endpoint == "copyMessage":
+            result = {"message_id": 1}
+        elif endpoint == "createForumTopic":
+            result = {"message_thread_id": 1, "name": params.get("name", ""), "icon_color": 7322096}
+        elif endpoint.startswith("send") or endpoint == "forwardMessage":
+            result = {"message_id": 1, "date": 0, "chat": {"id": params.get("chat_id", 0), "type": "private"}}
+        else:
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+def build_bench_application(latency: float) -> Any:
+    return build_application(with_updater=False, request=BenchRequest(latency))
+
+def prepare_database(users: int) -> None:
+    """重建基准数据库：所有用户已验证且已有对应话题"""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(BENCH_DB + suffix):
+            os.remove(BENCH_DB + suffix)
+    conn = sqlite3.connect(BENCH_DB)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE users (user_id INTEGER PRIMARY KEY, verified BOOLEAN DEFAULT 0, last_active INTEGER DEFAULT 0)")
+    conn.execute("CREATE TABLE user_topics (user_id INTEGER PRIMARY KEY, topic_id INTEGER, topic_name TEXT, created_at INTEGER)")
+    conn.executemany("INSERT INTO users VALUES (?, 1, 0)", [(uid,) for uid in range(1, users + 1)])
+    conn.executemany(
+        "INSERT INTO user_topics VALUES (?, ?, ?, 0)",
+        [(uid, uid + TOPIC_OFFSET, f"user ({uid})") for uid in range(1, users + 1)]
+    )
+    conn.commit()
+    conn.close()
+
+def make_updates(count: int, users: int) -> List[Dict[str, Any]]:
+    """交替生成用户私聊消息和管理员在话题中的回复"""
+    updates = []
+    for i in range(count):
+        uid = i % users + 1
+        if i % 2 == 0:
+            message = {
+                "message_id": i,
+                "date": 0,
+                "chat": {"id": uid, "type": "private", "first_name": f"user{uid}"},
+                "from": {"id": uid, "is_bot": False, "first_name": f"user{uid}"},
+                "text": f"hello {i}"
+            }
+        else:
+            message = {
+                "message_id": i,
+                "date": 0,
+                "chat": {"id": GROUP_ID, "type": "supergroup", "title": "bench", "is_forum": True},
+                "from": {"id": OWNER_ID, "is_bot": False, "first_name": "owner"},
+                "message_thread_id": uid + TOPIC_OFFSET,
+                "is_topic_message": True,
+                "text": f"reply {i}"
+            }
+        updates.append({"update_id": i + 1, "message": message})
+    return updates
+
+def run_once(workers: int, updates: List[Dict[str, Any]], users: int, latency: float) -> float:
+    """返回处理全部更新所用秒数（不含工作进程启动时间）"""
+    prepare_database(users)
+    pool = ShardPool(workers, partial(build_bench_application, latency))
+    pool.start()
+    started = time.perf_counter()
+    try:
+        for i in range(0, len(updates), BATCH_SIZE):
+            pool.dispatch(updates[i:i + BATCH_SIZE])
+    finally:
+        pool.stop(timeout=None)
+    return time.perf_counter() - started
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="分片模式吞吐量基准测试")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--updates", type=int, default=4000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.0, help="模拟每次 API 调用的网络延迟（秒）")
+    args = parser.parse_args()
+    updates = make_updates(args.updates, args.users)
+    print(f"更新数: {args.updates}, 用户数: {args.users}, 模拟延迟: {args.latency}s")
+    print(f"{'workers':>8} {'seconds':>10} {'updates/s':>12} {'speedup':>8}")
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        elapsed = run_once(workers, updates, args.users, args.latency)
+        rate = args.updates / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>8} {elapsed:>10.2f} {rate:>12.1f} {rate / baseline:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
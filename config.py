@@ -15,6 +15,7 @@ class Config:
     GROUP_ID: int = int(os.getenv("GROUP_ID", "0"))
     DB_NAME: str = os.getenv("DB_NAME", "forward_bot.db")
     FLOOD_LIMIT_SECONDS: int = int(os.getenv("FLOOD_LIMIT_SECONDS", "0"))
+    WORKERS: int = int(os.getenv("WORKERS", "1"))
 
     @classmethod
     def validate(cls) -> None:
@@ -29,6 +30,8 @@ class Config:
             raise ValueError("DB_NAME 配置不正确，必须以 .db 结尾")
         if not isinstance(cls.FLOOD_LIMIT_SECONDS, int) or not (0 <= cls.FLOOD_LIMIT_SECONDS <= 3600):
             raise ValueError("FLOOD_LIMIT_SECONDS 配置不正确，必须为0-3600之间的整数")
+        if not isinstance(cls.WORKERS, int) or not (1 <= cls.WORKERS <= 64):
+            raise ValueError("WORKERS 配置不正确，必须为1-64之间的整数")
         token_preview = cls.BOT_TOKEN[:5] + "..." if cls.BOT_TOKEN else "None"
         logger.info(f"配置验证通过: BOT_TOKEN={token_preview}, OWNER_ID={cls.OWNER_ID}, GROUP_ID={cls.GROUP_ID}")
 
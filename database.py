@@ -8,12 +8,19 @@ from config import Config
 
 logger = logging.getLogger(__name__)
 
+BUSY_TIMEOUT_SECONDS = 30  # 多进程写入时等待数据库锁的最长时间
+
 class Database:
     """数据库操作类"""
     def __init__(self) -> None:
         self.db_path = Config.DB_NAME
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn = self._connect()
         self._init_db()
+    def _connect(self) -> sqlite3.Connection:
+        """建立数据库连接，启用WAL以支持多个工作进程同时访问"""
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
     def _init_db(self) -> None:
         retry = 0
         while retry < 3:
@@ -53,13 +60,13 @@ class Database:
     def _ensure_connection(self):
         """确保数据库连接可用，不可用时自动重连。"""
         if self.conn is None:
-            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn = self._connect()
             logger.warning("数据库连接为None，已自动重连")
             return
         try:
             self.conn.execute('SELECT 1')
         except Exception:
-            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn = self._connect()
             logger.warning("数据库连接已断开，已自动重连")
 
     @contextmanager
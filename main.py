@@ -1,5 +1,6 @@
 # Telegram转发机器人主程序
 import logging
+from functools import partial
 from typing import Optional
 import signal
 import sys
@@ -13,6 +14,7 @@ from telegram.ext import (
     filters
 )
 from telegram.error import Forbidden
+from telegram.request import BaseRequest
 
 from config import Config
 from database import Database
@@ -91,20 +93,35 @@ def setup_handlers(application: Application) -> None:
     ))
 
 
-def main() -> None:
-    """主函数，启动机器人"""
-    Config.validate()
+def build_application(with_updater: bool = True, request: Optional[BaseRequest] = None) -> Application:
+    """构建机器人应用并挂载依赖实例和消息处理器"""
     if not isinstance(Config.BOT_TOKEN, str) or not Config.BOT_TOKEN:
         raise ValueError("Config.BOT_TOKEN 必须为非空字符串")
-    application = Application.builder() \
+    builder = Application.builder() \
         .token(Config.BOT_TOKEN) \
-        .post_init(post_init) \
-        .build()
+        .post_init(post_init)
+    if not with_updater:
+        builder = builder.updater(None)
+    if request is not None:
+        builder = builder.request(request)
+    application = builder.build()
     # 挂载依赖实例
     application.bot_data['db'] = Database()
     from flood_control import FloodControl
     application.bot_data['flood_control'] = FloodControl()
     setup_handlers(application)
+    return application
+
+
+def main() -> None:
+    """主函数，启动机器人"""
+    Config.validate()
+    if Config.WORKERS > 1:
+        from sharding import run_sharded
+        logger.info(f"机器人以分片模式运行，工作进程数: {Config.WORKERS}")
+        run_sharded(partial(build_application, with_updater=False))
+        return
+    application = build_application()
     logger.info("机器人开始运行...")
 
     def graceful_exit(signum, frame):
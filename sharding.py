@@ -0,0 +1,188 @@
+# 分片部署模块：前端进程拉取更新，按用户一致性哈希分发给多个工作进程
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import queue
+import signal
+import warnings
+from typing import Any, Callable, Dict, List, Optional
+
+from telegram import Bot, Update
+from telegram.error import NetworkError, TelegramError
+from telegram.ext import Application
+from telegram.warnings import PTBUserWarning
+
+from config import Config
+from database import Database
+
+logger = logging.getLogger(__name__)
+
+POLL_TIMEOUT = 30  # getUpdates 长轮询秒数
+WORKER_START_TIMEOUT = 60  # 等待工作进程启动的最长秒数
+WORKER_STOP_TIMEOUT = 30  # 等待工作进程退出的最长秒数
+
+def shard_for(key: int, shards: int) -> int:
+    """一致性哈希（Jump Consistent Hash），返回 key 所属的分片编号"""
+    digest = hashlib.blake2b(str(key).encode(), digest_size=8).digest()
+    h = int.from_bytes(digest, "big")
+    b, j = -1, 0
+    while j < shards:
+        b = j
+        h = (h * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * ((1 << 31) / ((h >> 33) + 1)))
+    return b
+
+def get_routing_key(data: Dict[str, Any]) -> int:
+    """从原始更新中取路由键：群组话题消息用话题ID，其余用发送者ID"""
+    for field, payload in data.items():
+        if field == "update_id" or not isinstance(payload, dict):
+            continue
+        chat_type = payload.get("chat", {}).get("type")
+        if chat_type in ("group", "supergroup") and payload.get("is_topic_message"):
+            return payload["message_thread_id"]
+        user = payload.get("from") or payload.get("user")
+        if user and "id" in user:
+            return user["id"]
+    return data.get("update_id", 0)
+
+def _run_worker(index: int, updates: Any, ready: Any, builder: Callable[[], Application]) -> None:
+    """工作进程入口"""
+    # Ctrl+C 由前端进程处理，工作进程等待结束信号后自行退出
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_worker_loop(index, updates, ready, builder))
+
+async def _worker_loop(index: int, updates: Any, ready: Any, builder: Callable[[], Application]) -> None:
+    application = builder()
+    await application.initialize()
+    try:
+        if index == 0 and application.post_init:
+            await application.post_init(application)
+        await application.start()
+        ready.put(index)
+        logger.info(f"工作进程 {index} 已启动")
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await loop.run_in_executor(None, updates.get)
+            if batch is None:
+                break
+            for data in batch:
+                await application.update_queue.put(Update.de_json(data, application.bot))
+        await application.stop()
+    finally:
+        await application.shutdown()
+        application.bot_data['db'].close()
+        logger.info(f"工作进程 {index} 已退出")
+
+class ShardPool:
+    """分片工作进程池，同一路由键的更新始终按顺序交给同一个工作进程"""
+    def __init__(self, workers: int, builder: Callable[[], Application]) -> None:
+        self.workers = workers
+        self.builder = builder
+        self._ctx = multiprocessing.get_context("spawn")
+        self._queues: List[Any] = []
+        self._processes: List[Any] = []
+    def start(self) -> None:
+        """启动所有工作进程，并等待其就绪"""
+        ready = self._ctx.Queue()
+        for index in range(self.workers):
+            updates = self._ctx.Queue()
+            process = self._ctx.Process(
+                target=_run_worker,
+                args=(index, updates, ready, self.builder),
+                name=f"shard-{index}",
+                daemon=True
+            )
+            process.start()
+            self._queues.append(updates)
+            self._processes.append(process)
+        for _ in range(self.workers):
+            try:
+                ready.get(timeout=WORKER_START_TIMEOUT)
+            except queue.Empty:
+                self.stop()
+                raise RuntimeError("工作进程启动超时")
+        logger.info(f"已启动 {self.workers} 个工作进程")
+    def dispatch(self, batch: List[Dict[str, Any]]) -> None:
+        """按路由键将一批原始更新分发给对应的工作进程"""
+        shards: Dict[int, List[Dict[str, Any]]] = {}
+        for data in batch:
+            shards.setdefault(shard_for(get_routing_key(data), self.workers), []).append(data)
+        for index, updates in shards.items():
+            self._queues[index].put(updates)
+    def is_alive(self) -> bool:
+        """所有工作进程是否都在运行"""
+        return all(process.is_alive() for process in self._processes)
+    def stop(self, timeout: Optional[float] = WORKER_STOP_TIMEOUT) -> None:
+        """通知工作进程处理完剩余更新后退出，timeout 为 None 时一直等待"""
+        for updates in self._queues:
+            try:
+                updates.put(None)
+            except Exception as e:
+                logger.debug(f"发送结束信号失败: {e}")
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"工作进程 {process.name} 未能按时退出，强制终止")
+                process.terminate()
+        self._queues.clear()
+        self._processes.clear()
+
+async def _fetch_updates(bot: Bot, offset: int) -> List[Dict[str, Any]]:
+    """拉取原始JSON更新，反序列化交给工作进程完成"""
+    with warnings.catch_warnings():
+        # 这里有意绕过 Bot.get_updates，以免在前端进程中构造 Update 对象
+        warnings.simplefilter("ignore", PTBUserWarning)
+        return await bot.do_api_request(
+            "get_updates",
+            api_kwargs={"offset": offset, "timeout": POLL_TIMEOUT},
+            read_timeout=POLL_TIMEOUT + 10
+        )
+
+async def _poll_updates(pool: ShardPool) -> None:
+    """前端进程：长轮询获取更新并分发"""
+    if not isinstance(Config.BOT_TOKEN, str) or not Config.BOT_TOKEN:
+        raise ValueError("Config.BOT_TOKEN 必须为非空字符串")
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+    async with Bot(Config.BOT_TOKEN) as bot:
+        await bot.delete_webhook(drop_pending_updates=True)
+        offset = 0
+        while not stop_event.is_set():
+            if not pool.is_alive():
+                logger.error("有工作进程意外退出，停止分发")
+                break
+            fetch = asyncio.ensure_future(_fetch_updates(bot, offset))
+            stopper = asyncio.ensure_future(stop_event.wait())
+            done, pending = await asyncio.wait({fetch, stopper}, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            if fetch not in done:
+                break
+            try:
+                batch = fetch.result()
+            except NetworkError as e:
+                logger.warning(f"拉取更新网络异常: {e}")
+                await asyncio.sleep(1)
+                continue
+            except TelegramError as e:
+                logger.error(f"拉取更新失败: {e}")
+                await asyncio.sleep(1)
+                continue
+            if batch:
+                pool.dispatch(batch)
+                offset = batch[-1]["update_id"] + 1
+
+def run_sharded(builder: Callable[[], Application]) -> None:
+    """以分片模式运行机器人"""
+    # 先在前端进程中完成建表和WAL切换，避免多个工作进程同时初始化
+    Database().close()
+    pool = ShardPool(Config.WORKERS, builder)
+    pool.start()
+    try:
+        asyncio.run(_poll_updates(pool))
+    finally:
+        pool.stop()
+        logger.info("分片模式已停止")